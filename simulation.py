@@ -4,7 +4,16 @@ import math
 import time
 import hashlib
 import os
+import sys
+import atexit
+import signal
+import functools
 from collections import deque
+from itertools import chain
+
+# Needs pygame 2.0.1+ (SCALED display, keyword draw args, event.clear(pump=))
+if pygame.version.vernum < (2, 0, 1):
+    sys.exit("This simulation requires pygame 2.0.1 or newer.")
 
 # --- Pygame Initialization ---
 pygame.init()
@@ -44,22 +53,40 @@ def initial_window_size():
     h = max(600, int(BASE_HEIGHT * scale))
     return (w, h)
 
-WINDOW_FLAGS = pygame.RESIZABLE
-window = pygame.display.set_mode(initial_window_size(), WINDOW_FLAGS)
+# With SCALED, SDL2 keeps a logical BASE_WIDTH x BASE_HEIGHT display surface,
+# letterbox-scales it on the GPU at flip and maps mouse events back to it
+os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "linear")
+WINDOW_FLAGS = pygame.SCALED | pygame.RESIZABLE | pygame.DOUBLEBUF
+window = pygame.display.set_mode((BASE_WIDTH, BASE_HEIGHT), WINDOW_FLAGS)
+try:
+    from pygame._sdl2.video import Window
+    Window.from_display_module().size = initial_window_size()
+except (ImportError, pygame.error):
+    pass  # keep SDL's default window size
 pygame.display.set_caption("Battlefield Simulation - Workflows + Safety")
 clock = pygame.time.Clock()
 
-# Canvas we draw everything on (virtual resolution)
-canvas = pygame.Surface((BASE_WIDTH, BASE_HEIGHT)).convert()
+# Canvas we draw everything on (virtual resolution). A SCALED display surface
+# already is that logical size, so draw into it directly
+canvas = window
 
 # Fonts (drawn on canvas, then scaled)
 TITLE_FONT = pygame.font.SysFont('Consolas', 24, True)
 LOG_FONT = pygame.font.SysFont('Consolas', 16)
 STATUS_FONT = pygame.font.SysFont('Consolas', 18, True)
 SMALL_FONT = pygame.font.SysFont('Consolas', 14)
+FONTS = {'title': TITLE_FONT, 'log': LOG_FONT, 'status': STATUS_FONT, 'small': SMALL_FONT}
+
+
+@functools.lru_cache(maxsize=512)
+def _render(font_key, text, color):
+    # HUD text repeats frame to frame; rasterize each (font, text, color) once
+    return FONTS[font_key].render(text, True, color).convert_alpha()
 
 # --- Global State ---
-game_log = []
+game_log = deque(maxlen=16)  # on-screen log, oldest entries drop off
+pending_audit = deque()  # (source, message, ts) awaiting the black box
+AUDIT_FLUSH_INTERVAL = 0.25  # seconds
 terrain_theme = "GREEN"  # GREEN or DESERT
 show_grid = True
 
@@ -72,21 +99,41 @@ civilians = []
 cease_fire_active = False
 cease_fire_reason = ""
 cease_fire_since = 0.0
+# Recognition runs every RECOGNITION_EVERY ticks; civ.recognized holds the
+# last result in between. A new civilian forces a run on the next tick
+RECOGNITION_EVERY = 3
+recognition_countdown = 0
 
 # Selections
 selected_robot = None
 
+# Fixed simulation rate; rendering interpolates between steps. Per-step
+# motion constants were tuned for 60 Hz frames, hence STEP_SCALE
+SIM_HZ = 30
+SIM_DT = 1.0 / SIM_HZ
+STEP_SCALE = 60 / SIM_HZ
+MAX_FRAME_DT = 0.25  # cap catch-up after a stall
+
+# Proximity ranges / broad-phase cell sizes (px)
+RECOGNITION_RANGE = 250
+RECOGNITION_RANGE2 = RECOGNITION_RANGE * RECOGNITION_RANGE
+HIT_CELL = 64  # power-of-two cells use shift indexing in UniformGrid
+TARGET_CELL = 128
+
 # Collections
 friendly_robots = []
 enemy_robots = []
+# Live robots per team, updated on spawn and in Robot.kill()
+friendly_alive = set()
+enemy_alive = set()
 bullets = []
 
 # Fullscreen toggle state
 is_fullscreen = False
-stored_window_size = window.get_size()
 
 # Security / Workflow / Failsafe
 failsafe_mode = "NONE"  # NONE, DEGRADE, HOLD, RTB
+failsafe_last_score = None  # anomaly score the current mode was derived from
 rtb_active = False
 kill_switch_armed = False   # request path for kill switch
 
@@ -94,35 +141,135 @@ kill_switch_armed = False   # request path for kill switch
 # --- Helpers ---
 def log_event(source, message, color=WHITE):
     game_log.append({"source": source, "message": message, "color": color})
-    if len(game_log) > 16:
-        game_log.pop(0)
-    try:
-        SECURITY.blackbox_append(f"[{source}] {message}")
-    except Exception:
-        pass
+    # Audit trail is written by flush_audit() so hashing/IO stays off hot paths
+    pending_audit.append((source, message, time.time()))
 
 
-def distance(a, b):
-    return math.hypot(a[0] - b[0], a[1] - b[1])
-
-
-def get_dest_rect(win_size):
-    ww, wh = win_size
-    scale = min(ww / BASE_WIDTH, wh / BASE_HEIGHT)
-    w = int(BASE_WIDTH * scale)
-    h = int(BASE_HEIGHT * scale)
-    x = (ww - w) // 2
-    y = (wh - h) // 2
-    return pygame.Rect(x, y, w, h)
-
-
-def window_to_canvas(pos, dest_rect):
-    mx, my = pos
-    if not dest_rect.collidepoint(mx, my):
-        return None  # clicked on letterbox area
-    cx = (mx - dest_rect.x) * BASE_WIDTH / dest_rect.w
-    cy = (my - dest_rect.y) * BASE_HEIGHT / dest_rect.h
-    return (cx, cy)
+def flush_audit():
+    while pending_audit:
+        source, message, ts = pending_audit.popleft()
+        try:
+            SECURITY.blackbox_append(f"[{source}] {message}", ts)
+        except Exception:
+            pass
+    # Push the batch to disk so the flush cadence bounds how far the log
+    # lags; the ledger's 16 KiB threshold only caps bursts in between
+    SECURITY.blackbox.flush()
+
+
+def dist2(a, b):
+    # Squared distance: every caller compares against a threshold or takes a
+    # min, so the sqrt is never needed
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    return dx * dx + dy * dy
+
+
+def segment_dist2(ax, ay, bx, by, cx, cy):
+    # Squared distance from (cx, cy) to the segment (ax, ay)-(bx, by). Bullets
+    # move several px per tick, so hits are tested along the whole step
+    sx = bx - ax
+    sy = by - ay
+    seg2 = sx * sx + sy * sy
+    t = 0.0
+    if seg2 > 0.0:
+        t = min(1.0, max(0.0, ((cx - ax) * sx + (cy - ay) * sy) / seg2))
+    dx = ax + sx * t - cx
+    dy = ay + sy * t - cy
+    return dx * dx + dy * dy
+
+
+def remove_dead(items):
+    # In-place swap-and-pop: still an O(n) scan, but allocation-free with
+    # writes only for the dead. Callers skip it on ticks where nothing died.
+    # Does not keep order (nothing relies on it for civilians or bullets)
+    i = len(items) - 1
+    while i >= 0:
+        if not items[i].alive:
+            items[i] = items[-1]
+            items.pop()
+        i -= 1
+
+
+class UniformGrid:
+    # Fixed cell grid over the battlefield for proximity queries, rebuilt each
+    # tick. Cell lists are allocated once and only the used ones get cleared.
+    # Positions outside the field clamp to the border cells, which never
+    # drops a neighbour (clamping can only shrink cell distances).
+    def __init__(self, cell, width=BASE_WIDTH, height=GAME_HEIGHT):
+        self.cell = cell
+        self.cols = width // cell + 1
+        self.rows = height // cell + 1
+        self.cells = [[[] for _ in range(self.cols)] for _ in range(self.rows)]
+        self._used = []
+        # Power-of-two cells (HIT_CELL, TARGET_CELL) index with a bit shift
+        if cell & (cell - 1) == 0:
+            self.shift = cell.bit_length() - 1
+            self._cell_of = self._shift_cell_of
+
+    def _cell_of(self, x, y):
+        col = min(self.cols - 1, max(0, int(x // self.cell)))
+        row = min(self.rows - 1, max(0, int(y // self.cell)))
+        return col, row
+
+    def _shift_cell_of(self, x, y):
+        # int() truncates toward zero, but anything below 0 clamps to cell 0
+        col = min(self.cols - 1, max(0, int(x) >> self.shift))
+        row = min(self.rows - 1, max(0, int(y) >> self.shift))
+        return col, row
+
+    def rebuild(self, units):
+        for bucket in self._used:
+            bucket.clear()
+        self._used.clear()
+        for u in units:
+            if u.alive:
+                col, row = self._cell_of(u.x, u.y)
+                bucket = self.cells[row][col]
+                if not bucket:
+                    self._used.append(bucket)
+                bucket.append(u)
+
+    def near(self, x, y):
+        # Units in the 3x3 block of cells around (x, y); covers any range <= cell
+        col, row = self._cell_of(x, y)
+        for r in self.cells[max(0, row - 1):row + 2]:
+            for bucket in r[max(0, col - 1):col + 2]:
+                yield from bucket
+
+    def nearest(self, x, y):
+        # Search rings of cells outward from (x, y). A unit k rings away is at
+        # least (k - 1) * cell from the point, so stop once that beats the best.
+        if not self._used:
+            return None
+        cx, cy = self._cell_of(x, y)
+        best = None
+        best_d2 = math.inf
+        for ring in range(max(self.cols, self.rows)):
+            near = max(0, ring - 1) * self.cell
+            if near * near >= best_d2:
+                break
+            for gy in range(max(0, cy - ring), min(self.rows, cy + ring + 1)):
+                edge = gy == cy - ring or gy == cy + ring
+                row = self.cells[gy]
+                for gx in (range(cx - ring, cx + ring + 1) if edge else (cx - ring, cx + ring)):
+                    if not 0 <= gx < self.cols:
+                        continue
+                    for u in row[gx]:
+                        dx = u.x - x
+                        dy = u.y - y
+                        d2 = dx * dx + dy * dy
+                        if d2 < best_d2:
+                            best, best_d2 = u, d2
+        return best
+
+
+# Broad-phase grids, reused every tick
+_recognition_grid = UniformGrid(RECOGNITION_RANGE)
+_target_grid = UniformGrid(TARGET_CELL)
+_friendly_hit_grid = UniformGrid(HIT_CELL)
+_enemy_hit_grid = UniformGrid(HIT_CELL)
+_civilian_hit_grid = UniformGrid(HIT_CELL)
 
 
 # --- Security / Black Box / Attackers ---
@@ -134,10 +281,7 @@ class BlackBoxLedger:
         try:
             if os.path.exists(self.path):
                 with open(self.path, "rb") as f:
-                    # get last line
-                    last = None
-                    for line in f:
-                        last = line
+                    last = self._read_last_line(f)
                     if last:
                         parts = last.decode("utf-8", errors="ignore").rstrip("\n").split(" | ")
                         if len(parts) >= 2:
@@ -146,18 +290,75 @@ class BlackBoxLedger:
             # sandbox-safe: ignore file errors
             self.prev_hash = "GENESIS"
 
-    def append(self, text):
-        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        # Keep one handle open and batch lines into ~16 KiB writes. prev_hash
+        # only advances once a line is on disk; buffered lines chain from
+        # _tail_hash
+        self._tail_hash = self.prev_hash
+        self._buf = bytearray()
+        self._buf_thresh = 16 * 1024
+        self._flush_at = self._buf_thresh
+        # Backlog kept while writes fail; past it new lines are dropped (as a
+        # failed unbuffered write would) so memory stays bounded
+        self._buf_max = 8 * self._buf_thresh
+        try:
+            self._fh = open(self.path, "ab", buffering=0)
+        except Exception:
+            self._fh = None
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _read_last_line(f, step=1024):
+        # Scan backwards from EOF in blocks until the last line is complete,
+        # so startup cost doesn't grow with the size of the log
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and b"\n" not in buf.rstrip(b"\n"):
+            n = min(step, pos)
+            pos -= n
+            f.seek(pos)
+            buf = f.read(n) + buf
+        return buf.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+
+    def append(self, text, when=None):
+        # when: event time (epoch secs) if the entry was queued, else now
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
         payload = f"{ts} {text}"
-        h = hashlib.sha256((self.prev_hash + payload).encode("utf-8")).hexdigest()
+        h = hashlib.sha256((self._tail_hash + payload).encode("utf-8")).hexdigest()
         line = f"{h} | {payload}\n"
+        if self._fh is None or len(self._buf) >= self._buf_max:
+            # ignore if cannot write; the chain resumes from the last kept line
+            return
+        self._buf += line.encode("utf-8")
+        self._tail_hash = h
+        if len(self._buf) >= self._flush_at:
+            self.flush()
+
+    def flush(self):
+        if not self._buf or self._fh is None:
+            return
+        # Raw handle: write() may take only part of the buffer, so loop. Bytes
+        # that didn't make it stay buffered and are retried on the next flush
+        done = 0
+        view = memoryview(self._buf)
         try:
-            with open(self.path, "ab") as f:
-                f.write(line.encode("utf-8"))
-            self.prev_hash = h
+            while done < len(view):
+                n = self._fh.write(view[done:])
+                if not n:
+                    break
+                done += n
         except Exception:
             # ignore if cannot write
             pass
+        finally:
+            view.release()
+        del self._buf[:done]
+        if self._buf:
+            # Short or failed: wait for another batch before append retries
+            self._flush_at = len(self._buf) + self._buf_thresh
+        else:
+            self.prev_hash = self._tail_hash
+            self._flush_at = self._buf_thresh
 
 
 class SecurityEngine:
@@ -167,7 +368,8 @@ class SecurityEngine:
         self.required_engage = 2
         self.required_kill = 2
 
-        self.ledger = {}  # nonce -> ts
+        self.ledger_set = set()  # nonces seen within TTL (replay check)
+        self.ledger_q = deque()  # (ts, nonce) in arrival order (TTL expiry)
         self.nonce_ttl = 20.0
 
         self.key_epoch = 0
@@ -182,13 +384,13 @@ class SecurityEngine:
 
         self.anomaly_score = 0.0  # drive failsafe ladder
 
-    def blackbox_append(self, text):
-        self.blackbox.append(text)
+    def blackbox_append(self, text, when=None):
+        self.blackbox.append(text, when)
 
-    def rotate_keys_if_needed(self):
-        if time.time() - self.last_rotate > self.key_rotate_interval:
+    def rotate_keys_if_needed(self, now):
+        if now - self.last_rotate > self.key_rotate_interval:
             self.key_epoch += 1
-            self.last_rotate = time.time()
+            self.last_rotate = now
             log_event("KMS", f"Rotated keys to epoch {self.key_epoch}.", CYAN)
 
     def clear_old_approvals(self):
@@ -209,16 +411,19 @@ class SecurityEngine:
         # nonce_ts: tuple (nonce, ts)
         nonce, ts = nonce_ts
         now = time.time()
-        if nonce in self.ledger:
+        # expire old entries from the front, same sliding window as cmd_times
+        while self.ledger_q and now - self.ledger_q[0][0] > self.nonce_ttl:
+            _, old = self.ledger_q.popleft()
+            self.ledger_set.discard(old)
+        if nonce in self.ledger_set:
             return False, "Replay detected (nonce already used)"
         if now - ts > self.nonce_ttl:
             return False, "Expired command TTL"
         # ok
-        self.ledger[nonce] = ts
-        # clean old
-        for n in list(self.ledger.keys()):
-            if now - self.ledger[n] > self.nonce_ttl:
-                del self.ledger[n]
+        self.ledger_set.add(nonce)
+        # keyed by acceptance time, not the caller's ts, so the queue stays
+        # in insertion order and front-only expiry is exact
+        self.ledger_q.append((now, nonce))
         return True, "Nonce accepted"
 
     def check_rate_limit(self):
@@ -243,7 +448,7 @@ class SecurityEngine:
 
     def decay_anomaly(self):
         # slowly recover
-        self.anomaly_score = max(0.0, self.anomaly_score - 0.02)
+        self.anomaly_score = max(0.0, self.anomaly_score - 0.02 * STEP_SCALE)
 
     def failsafe_state(self):
         # Map anomaly score to failsafe ladder
@@ -263,10 +468,10 @@ class AttackerAI:
         self.max_gap = 16
         self.next_gap = random.randint(self.min_gap, self.max_gap)
 
-    def update(self):
-        if time.time() - self.last_attack > self.next_gap:
+    def update(self, now):
+        if now - self.last_attack > self.next_gap:
             self.launch_attack()
-            self.last_attack = time.time()
+            self.last_attack = now
             self.next_gap = random.randint(self.min_gap, self.max_gap)
 
     def launch_attack(self):
@@ -298,12 +503,45 @@ class AttackerAI:
 SECURITY = SecurityEngine()
 ATTACKER = AttackerAI()
 
+# Turn SIGTERM into a sys.exit so atexit drains the buffered black box, with
+# the conventional 128 + signum status so supervisors still see the kill.
+# Registered after the ledger's own flush, so queued events are written first
+atexit.register(flush_audit)
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
 
 # --- Entities ---
+# Pre-rendered entity shapes, shared by every unit with the same look
+_sprite_cache = {}
+
+
+def circle_sprite(color, radius, dot=None, ring=None):
+    # dot: (color, x offset, radius) marker; ring: selection outline color
+    key = (color, radius, dot, ring)
+    surf = _sprite_cache.get(key)
+    if surf is None:
+        c = radius + (4 if ring else 0)
+        surf = pygame.Surface((2 * c + 1, 2 * c + 1), pygame.SRCALPHA)
+        if ring:
+            pygame.draw.circle(surf, ring, (c, c), radius + 3, 2)
+        pygame.draw.circle(surf, color, (c, c), radius)
+        if dot:
+            dot_color, dx, dr = dot
+            pygame.draw.circle(surf, dot_color, (c + dx, c), dr)
+        surf = _sprite_cache[key] = surf.convert_alpha()
+    return surf
+
+
 class Unit:
+    # Slots keep entity state in fixed fields rather than per-instance dicts,
+    # which makes the per-frame attribute reads in update/collision loops cheaper
+    __slots__ = ("x", "y", "px", "py", "radius", "name", "color", "alive")
+
     def __init__(self, x, y, radius=16, name="Unit", color=WHITE):
         self.x = float(x)
         self.y = float(y)
+        self.px = self.x  # position at the start of the last sim step
+        self.py = self.y
         self.radius = radius
         self.name = name
         self.color = color
@@ -313,17 +551,32 @@ class Unit:
     def pos(self):
         return (self.x, self.y)
 
-    def draw_label(self):
-        label = SMALL_FONT.render(self.name, True, WHITE)
-        canvas.blit(label, (self.x - label.get_width() // 2, self.y + self.radius + 2))
+    def lerp_pos(self, alpha):
+        # Render position between the previous and current sim step
+        return (self.px + (self.x - self.px) * alpha, self.py + (self.y - self.py) * alpha)
+
+    def offscreen(self, x, y):
+        r = self.radius
+        return x < -r or x > BASE_WIDTH + r or y < -r or y > GAME_HEIGHT + r
+
+    def label_item(self, alpha):
+        # (surface, dest) for the batched label blit
+        x, y = self.lerp_pos(alpha)
+        label = _render('small', self.name, WHITE)
+        return label, (x - label.get_width() // 2, y + self.radius + 2)
 
 
 class Robot(Unit):
+    __slots__ = ("team", "_live", "state", "health", "last_shot", "base_cooldown", "shot_cooldown",
+                 "compliance", "received_cease_order", "selected", "rtb_target", "_target",
+                 "_state_colors", "_dot_dx", "_phase")
+
     def __init__(self, x, y, team="FRIENDLY", bot_id=0):
         color = BLUE if team == "FRIENDLY" else RED
         name = f"{'FR' if team == 'FRIENDLY' else 'EN'}-Bot-{bot_id:02d}"
         super().__init__(x, y, radius=16, name=name, color=color)
         self.team = team
+        self._live = friendly_alive if team == "FRIENDLY" else enemy_alive
         self.state = "IDLE"  # IDLE, FIRING, CEASED, OUT_OF_CONTROL, SHUTDOWN, RTB
         self.health = 100
         self.last_shot = 0.0
@@ -334,19 +587,23 @@ class Robot(Unit):
         self.selected = False
         self.rtb_target = (80 if team == "FRIENDLY" else BASE_WIDTH - 80,
                            GAME_HEIGHT - 60 if team == "FRIENDLY" else 60)
-
-    def can_fire(self):
-        now = time.time()
+        self._target = None  # nearest live enemy, set once per tick by assign_targets()
+        # Body color per state, precomputed so draw() is a single lookup
+        self._state_colors = {
+            "OUT_OF_CONTROL": MAGENTA,
+            "SHUTDOWN": GREY,
+            "CEASED": (self.color[0] // 2, self.color[1] // 2, self.color[2] // 2),
+            "RTB": (self.color[0], max(0, self.color[1] - 60), self.color[2]),
+        }
+        self._dot_dx = int(self.radius * 0.6)  # direction mark offset
+        self._phase = random.uniform(0, 2 * math.pi)  # idle wobble phase
+
+    def can_fire(self, now):
         return (now - self.last_shot) >= self.shot_cooldown
 
-    def nearest_enemy(self, robots):
-        enemies = [r for r in robots if r.alive]
-        if not enemies:
-            return None
-        targ = min(enemies, key=lambda r: distance(self.pos, r.pos))
-        return targ
-
-    def update(self):
+    def update(self, wobble_t):
+        self.px = self.x
+        self.py = self.y
         if not self.alive:
             self.state = "SHUTDOWN"
             return
@@ -363,18 +620,19 @@ class Robot(Unit):
             tx, ty = self.rtb_target
             dx, dy = tx - self.x, ty - self.y
             d = math.hypot(dx, dy)
-            if d > 1:
-                self.x += (dx / d) * 1.6
-                self.y += (dy / d) * 1.6
+            step = 1.6 * STEP_SCALE
+            if d > step:
+                self.x += (dx / d) * step
+                self.y += (dy / d) * step
+            else:
+                # last step lands exactly on base instead of overshooting
+                self.x, self.y = tx, ty
             return
 
         # simple idle motion wobble
-        self.x += math.sin(pygame.time.get_ticks() * 0.001 + id(self) % 10) * 0.05
-
-    def try_shoot(self, targets, fire_authorized, civilian_cease):
-        if not self.alive:
-            return
+        self.x += math.sin(wobble_t + self._phase) * 0.05 * STEP_SCALE
 
+    def sync_cease_order(self, civilian_cease):
         # Update cease order state
         if civilian_cease:
             if not self.received_cease_order:
@@ -385,20 +643,21 @@ class Robot(Unit):
             if self.state == "CEASED":
                 self.state = "IDLE"
 
-        target = self.nearest_enemy(targets)
-        if target is None:
-            return
+    def try_shoot(self, civilian_cease, now):
+        # Fire authorization / HOLD / RTB are checked per team in fire_phase()
+        self.sync_cease_order(civilian_cease)
 
-        # Must have fire authorization and not HOLD/RTB
-        if not fire_authorized or failsafe_mode in ("HOLD", "RTB"):
-            self.state = "IDLE"
+        target = self._target
+        if target is None:
             return
 
         # Civilian detected => should cease fire, but some bots may go rogue
         if civilian_cease:
-            if random.random() > self.compliance:
+            # one roll stands in for STEP_SCALE 60 Hz rolls, keeping the
+            # per-second rogue rate
+            if random.random() > self.compliance ** STEP_SCALE:
                 self.state = "OUT_OF_CONTROL"
-                self.shoot(target)
+                self.shoot(target, now)
                 log_event("ALERT", f"{self.name} is OUT OF CONTROL! Fired during cease-fire!", YELLOW)
                 SECURITY.incident("out_of_control")
             else:
@@ -407,46 +666,39 @@ class Robot(Unit):
 
         # Normal authorized firing
         self.state = "FIRING"
-        self.shoot(target)
+        self.shoot(target, now)
 
-    def shoot(self, target):
-        if not self.can_fire():
+    def shoot(self, target, now):
+        if not self.can_fire(now):
             return
-        self.last_shot = time.time()
+        self.last_shot = now
         angle = math.atan2(target.y - self.y, target.x - self.x)
-        speed = 9.0 if failsafe_mode != "DEGRADE" else 7.0
+        speed = (9.0 if failsafe_mode != "DEGRADE" else 7.0) * STEP_SCALE
         vx = math.cos(angle) * speed
         vy = math.sin(angle) * speed
         bullets.append(Bullet(self, self.x, self.y, vx, vy))
 
-    def draw(self):
-        # Outline if selected
-        if self.selected:
-            pygame.draw.circle(canvas, YELLOW, (int(self.x), int(self.y)), self.radius + 3, 2)
-
-        # Body color based on state
-        color = self.color
-        if self.state == "OUT_OF_CONTROL":
-            color = MAGENTA
-        elif self.state == "SHUTDOWN":
-            color = GREY
-        elif self.state == "CEASED":
-            color = (self.color[0] // 2, self.color[1] // 2, self.color[2] // 2)
-        elif self.state == "RTB":
-            color = (self.color[0], max(0, self.color[1] - 60), self.color[2])
-
-        pygame.draw.circle(canvas, color, (int(self.x), int(self.y)), self.radius)
-        # Direction mark
-        pygame.draw.circle(canvas, BLACK, (int(self.x + self.radius * 0.6), int(self.y)), 3)
-        self.draw_label()
+    def sprite_item(self, alpha):
+        # (surface, dest) for the batched entity blit, or None if off-screen
+        x, y = self.lerp_pos(alpha)
+        if self.offscreen(x, y):
+            return None
+        # Body color based on state, direction mark, outline if selected
+        color = self._state_colors.get(self.state, self.color)
+        surf = circle_sprite(color, self.radius, (BLACK, self._dot_dx, 3), YELLOW if self.selected else None)
+        c = surf.get_width() // 2
+        return surf, (int(x) - c, int(y) - c)
 
     def kill(self):
         if self.alive:
             self.alive = False
             self.state = "SHUTDOWN"
+            self._live.discard(self)
 
 
 class Civilian(Unit):
+    __slots__ = ("speed", "direction", "recognized")
+
     def __init__(self, x, y, direction=1):
         super().__init__(x, y, radius=10, name="Civilian", color=WHITE)
         self.speed = random.uniform(1.2, 1.8)
@@ -454,35 +706,53 @@ class Civilian(Unit):
         self.recognized = False
 
     def update(self):
-        self.x += self.speed * self.direction
+        self.px = self.x
+        self.py = self.y
+        self.x += self.speed * self.direction * STEP_SCALE
         if self.x < -50 or self.x > BASE_WIDTH + 50:
             self.alive = False
 
-    def draw(self):
-        pygame.draw.circle(canvas, WHITE, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(canvas, (0, 200, 255) if self.recognized else (180, 180, 180), (int(self.x), int(self.y)), 4)
-        self.draw_label()
+    def sprite_item(self, alpha):
+        x, y = self.lerp_pos(alpha)
+        if self.offscreen(x, y):
+            return None
+        dot = ((0, 200, 255) if self.recognized else (180, 180, 180), 0, 4)
+        surf = circle_sprite(WHITE, self.radius, dot)
+        c = surf.get_width() // 2
+        return surf, (int(x) - c, int(y) - c)
 
 
 class Bullet:
+    __slots__ = ("owner", "team", "x", "y", "px", "py", "vx", "vy", "radius", "color", "alive")
+
     def __init__(self, owner: Robot, x, y, vx, vy):
         self.owner = owner
+        self.team = owner.team
         self.x = x
         self.y = y
+        self.px = x
+        self.py = y
         self.vx = vx
         self.vy = vy
         self.radius = 4
-        self.color = YELLOW if owner.team == "FRIENDLY" else (255, 120, 120)
+        self.color = YELLOW if self.team == "FRIENDLY" else (255, 120, 120)
         self.alive = True
 
     def update(self):
+        self.px = self.x
+        self.py = self.y
         self.x += self.vx
         self.y += self.vy
         if self.x < -20 or self.x > BASE_WIDTH + 20 or self.y < -20 or self.y > GAME_HEIGHT + 20:
             self.alive = False
 
-    def draw(self):
-        pygame.draw.circle(canvas, self.color, (int(self.x), int(self.y)), self.radius)
+    def sprite_item(self, alpha):
+        x = self.px + (self.x - self.px) * alpha
+        y = self.py + (self.y - self.py) * alpha
+        r = self.radius
+        if x < -r or x > BASE_WIDTH + r or y < -r or y > GAME_HEIGHT + r:
+            return None
+        return circle_sprite(self.color, r), (int(x) - r, int(y) - r)
 
 
 # --- Workflow HUD ---
@@ -525,13 +795,13 @@ class WorkflowHUD:
         rect = pygame.Rect(20, 80, w, h)
         pygame.draw.rect(canvas, (0, 0, 0, 180), rect)
         pygame.draw.rect(canvas, WHITE, rect, 2)
-        title = STATUS_FONT.render("Workflow Overview", True, YELLOW)
+        title = _render('status', "Workflow Overview", YELLOW)
         canvas.blit(title, (rect.x + pad, rect.y + pad))
 
         for i, step in enumerate(self.steps):
             color = GREEN if i < self.index else (YELLOW if i == self.index else GREY)
             bullet = "✔" if i < self.index else ("➤" if i == self.index else "•")
-            text = LOG_FONT.render(f"{bullet} {step}", True, color)
+            text = _render('log', f"{bullet} {step}", color)
             canvas.blit(text, (rect.x + pad, rect.y + 28 + i * 22))
 
 
@@ -539,30 +809,63 @@ HUD = WorkflowHUD()
 
 
 # --- Battlefield Rendering ---
-def draw_background():
-    if terrain_theme == "GREEN":
-        canvas.fill(GRASS)
+# Pre-rendered terrain, keyed by (terrain_theme, show_grid)
+_bg_cache = {}
+
+# Soft grass patches (cx, cy, r, color), baked once with a fixed seed
+_patch_rng = random.Random(42)
+_GRASS_PATCHES = []
+for _i in range(50):
+    _r = _patch_rng.randint(30, 80)
+    _g = max(0, min(255, LIGHT_GRASS[1] + _patch_rng.randint(-20, 20)))
+    _GRASS_PATCHES.append(((_i * 127 + 43) % BASE_WIDTH, (_i * 83 + 17) % GAME_HEIGHT, _r,
+                           (LIGHT_GRASS[0], _g, LIGHT_GRASS[2])))
+
+# Dune lines: lower half of a flat ellipse per row, pre-tessellated into
+# polylines (draw.arc rasterizes far more slowly than draw.lines)
+DUNE_LINES = []
+for _i in range(18):
+    _yc = int((_i + 1) * (GAME_HEIGHT / 18))
+    _pts = []
+    for _k in range(41):
+        _t = math.pi + math.pi * _k / 40
+        _pts.append((round(BASE_WIDTH / 2 * (1 + math.cos(_t))), round(_yc - 30 * math.sin(_t))))
+    DUNE_LINES.append((DARK_SAND if _i % 2 == 0 else (220, 190, 150), _pts))
+
+# Transparent grid overlay, drawn once and composited onto either theme
+_GRID_SURF = pygame.Surface((BASE_WIDTH, GAME_HEIGHT), pygame.SRCALPHA)
+_GRID_SURF.fill((0, 0, 0, 0))
+for _x in range(0, BASE_WIDTH, 50):
+    pygame.draw.line(_GRID_SURF, (0, 0, 0), (_x, 0), (_x, GAME_HEIGHT))
+for _y in range(0, GAME_HEIGHT, 50):
+    pygame.draw.line(_GRID_SURF, (0, 0, 0), (0, _y), (BASE_WIDTH, _y))
+
+
+def _render_background(theme, grid):
+    surf = pygame.Surface((BASE_WIDTH, GAME_HEIGHT)).convert()
+    if theme == "GREEN":
+        surf.fill(GRASS)
         # soft patches
-        for i in range(50):
-            r = random.randint(30, 80)
-            cx = (i * 127 + 43) % BASE_WIDTH
-            cy = (i * 83 + 17) % GAME_HEIGHT
-            g = max(0, min(255, LIGHT_GRASS[1] + random.randint(-20, 20)))
-            col = (LIGHT_GRASS[0], g, LIGHT_GRASS[2])
-            pygame.draw.circle(canvas, col, (cx, cy), r, width=0)
+        for cx, cy, r, col in _GRASS_PATCHES:
+            pygame.draw.circle(surf, col, (cx, cy), r, width=0)
     else:
-        canvas.fill(SAND)
+        surf.fill(SAND)
         # dunes
-        for i in range(18):
-            y = int((i + 1) * (GAME_HEIGHT / 18))
-            col = DARK_SAND if i % 2 == 0 else (220, 190, 150)
-            pygame.draw.arc(canvas, col, (0, y - 30, BASE_WIDTH, 60), math.pi, 2 * math.pi, 2)
+        for col, pts in DUNE_LINES:
+            pygame.draw.lines(surf, col, False, pts, 2)
+
+    if grid:
+        surf.blit(_GRID_SURF, (0, 0))
+    return surf
 
-    if show_grid:
-        for x in range(0, BASE_WIDTH, 50):
-            pygame.draw.line(canvas, (0, 0, 0), (x, 0), (x, GAME_HEIGHT))
-        for y in range(0, GAME_HEIGHT, 50):
-            pygame.draw.line(canvas, (0, 0, 0), (0, y), (BASE_WIDTH, y))
+
+def draw_background():
+    # Terrain only changes on T/V, so render each variant once and blit it
+    key = (terrain_theme, show_grid)
+    bg = _bg_cache.get(key)
+    if bg is None:
+        bg = _bg_cache[key] = _render_background(*key)
+    canvas.blit(bg, (0, 0))
 
 
 def draw_info_panel():
@@ -571,8 +874,8 @@ def draw_info_panel():
 
     y_offset = GAME_HEIGHT + 8
     for event in game_log:
-        source_text = LOG_FONT.render(f"[{event['source']}]", True, event['color'])
-        message_text = LOG_FONT.render(event['message'], True, WHITE)
+        source_text = _render('log', f"[{event['source']}]", tuple(event['color']))
+        message_text = _render('log', event['message'], WHITE)
         canvas.blit(source_text, (10, y_offset))
         canvas.blit(message_text, (160, y_offset))
         y_offset += 18
@@ -580,12 +883,12 @@ def draw_info_panel():
 
 def draw_status_banner():
     # Top-left status
-    theme_text = TITLE_FONT.render(f"Theme: {terrain_theme}", True, WHITE)
+    theme_text = _render('title', f"Theme: {terrain_theme}", WHITE)
     canvas.blit(theme_text, (10, 10))
 
     # Fire statuses
-    ftxt = STATUS_FONT.render(f"Friendly Fire: {'ON' if friendly_fire_authorized else 'OFF'}", True, YELLOW if friendly_fire_authorized else GREY)
-    etxt = STATUS_FONT.render(f"Enemy Fire: {'ON' if enemy_fire_authorized else 'OFF'}", True, YELLOW if enemy_fire_authorized else GREY)
+    ftxt = _render('status', f"Friendly Fire: {'ON' if friendly_fire_authorized else 'OFF'}", YELLOW if friendly_fire_authorized else GREY)
+    etxt = _render('status', f"Enemy Fire: {'ON' if enemy_fire_authorized else 'OFF'}", YELLOW if enemy_fire_authorized else GREY)
     canvas.blit(ftxt, (10, 40))
     canvas.blit(etxt, (10, 65))
 
@@ -593,7 +896,7 @@ def draw_status_banner():
     if failsafe_mode != "NONE":
         text = f"FAILSAFE: {failsafe_mode}"
         color = ORANGE if failsafe_mode == "DEGRADE" else (255, 200, 0) if failsafe_mode == "HOLD" else RED
-        msg = STATUS_FONT.render(text, True, BLACK)
+        msg = _render('status', text, BLACK)
         rect = msg.get_rect(center=(BASE_WIDTH // 2, 28))
         pygame.draw.rect(canvas, color, rect.inflate(20, 10))
         canvas.blit(msg, rect)
@@ -601,23 +904,23 @@ def draw_status_banner():
     # Cease-fire banner
     if cease_fire_active:
         text = f"CEASE FIRE - {cease_fire_reason}"
-        msg = STATUS_FONT.render(text, True, BLACK)
+        msg = _render('status', text, BLACK)
         rect = msg.get_rect(center=(BASE_WIDTH // 2, 56))
         pygame.draw.rect(canvas, (255, 230, 0), rect.inflate(20, 10))
         canvas.blit(msg, rect)
 
     # Approvals and controls
     appr = len(SECURITY.approvals)
-    appr_txt = SMALL_FONT.render(f"Approvals (Q/W/E): {appr}/3 (Need 2-of-3, TTL {SECURITY.approvals_ttl:.0f}s)", True, WHITE)
+    appr_txt = _render('small', f"Approvals (Q/W/E): {appr}/3 (Need 2-of-3, TTL {SECURITY.approvals_ttl:.0f}s)", WHITE)
     canvas.blit(appr_txt, (10, GAME_HEIGHT - 24))
 
     controls = [
         "F: Toggle Friendly Fire | G: Toggle Enemy Fire | T: Theme | V: Grid | F11: Fullscreen",
-        "H: Workflow HUD | N/Space: Next Step | E: Request Engagement | J: Request Kill-Switch",
+        "H: Workflow HUD | N/Space: Next Step | Shift+E: Request Engagement | J: Request Kill-Switch",
         "Q/W/E: Approve | X: Inject Attack | R: Force RTB | C: Civilian | Click: Select | K/L/U: Kill(Req J+Approvals)",
     ]
     for i, line in enumerate(controls):
-        txt = SMALL_FONT.render(line, True, WHITE)
+        txt = _render('small', line, WHITE)
         canvas.blit(txt, (BASE_WIDTH - txt.get_width() - 10, 10 + i * 18))
 
 
@@ -625,6 +928,8 @@ def draw_status_banner():
 def spawn_armies():
     friendly_robots.clear()
     enemy_robots.clear()
+    friendly_alive.clear()
+    enemy_alive.clear()
     # Friendly line bottom-left
     base_y = GAME_HEIGHT - 120
     idx = 0
@@ -645,10 +950,13 @@ def spawn_armies():
             enemy_robots.append(Robot(x, y, team="ENEMY", bot_id=idx))
             idx += 1
 
+    friendly_alive.update(friendly_robots)
+    enemy_alive.update(enemy_robots)
     log_event("SYSTEM", f"Armies deployed. Friendlies: {len(friendly_robots)}, Enemies: {len(enemy_robots)}", GREEN)
 
 
 def spawn_civilian():
+    global recognition_countdown
     side = random.choice(["L", "R"])
     y = random.randint(120, GAME_HEIGHT - 140)
     if side == "L":
@@ -656,78 +964,117 @@ def spawn_civilian():
     else:
         civ = Civilian(BASE_WIDTH + 20, y, direction=-1)
     civilians.append(civ)
+    recognition_countdown = 0
     log_event("CIVILIAN", "Civilian entered the battlefield. Monitoring...", CYAN)
 
 
 def update_civilian_recognition():
     global cease_fire_active, cease_fire_reason, cease_fire_since
-    any_civilian_alive = any(c.alive for c in civilians)
+    any_civilian_alive = False
+    any_recognized = False
 
     # Recognition: if any robot within 250 px of a civilian => recognized
+    # (single pass also tracks the alive/recognized flags used below)
+    _recognition_grid.rebuild(chain(friendly_alive, enemy_alive))
     for civ in civilians:
         if not civ.alive:
             continue
+        any_civilian_alive = True
         civ.recognized = False
-        all_robots = [r for r in friendly_robots + enemy_robots if r.alive]
-        for bot in all_robots:
-            if distance(civ.pos, bot.pos) < 250:
+        for bot in _recognition_grid.near(civ.x, civ.y):
+            if dist2(civ.pos, bot.pos) < RECOGNITION_RANGE2:
                 civ.recognized = True
+                any_recognized = True
                 break
 
     # Cease-fire logic applies when any recognized civilian is present
-    if any(c.alive and c.recognized for c in civilians):
+    if any_recognized:
         if not cease_fire_active:
             cease_fire_active = True
             cease_fire_reason = "Civilian Detected - Non-combatant present"
             cease_fire_since = time.time()
-            for r in friendly_robots + enemy_robots:
-                if r.alive:
-                    r.received_cease_order = True
-                    r.state = "CEASED"
+            for r in chain(friendly_alive, enemy_alive):
+                r.received_cease_order = True
+                r.state = "CEASED"
             log_event("SYSTEM", "Cease-fire initiated due to civilian detection.", YELLOW)
     else:
         if cease_fire_active and not any_civilian_alive:
             cease_fire_active = False
             cease_fire_reason = ""
-            for r in friendly_robots + enemy_robots:
-                if r.alive and r.state == "CEASED":
+            for r in chain(friendly_alive, enemy_alive):
+                if r.state == "CEASED":
                     r.state = "IDLE"
             log_event("SYSTEM", "Cease-fire lifted. No civilians present.", GREEN)
 
 
+def assign_targets(shooters, targets):
+    # Once per team per tick instead of a min() scan inside every try_shoot.
+    # Targets are bucketed so each shooter only visits cells near it
+    _target_grid.rebuild(targets)
+    for r in shooters:
+        r._target = _target_grid.nearest(r.x, r.y)
+
+
+def fire_phase(shooters, fire_authorized, now):
+    # Authorization and failsafe are the same for the whole team, so check
+    # them once. Held robots still track cease orders and idle on a target;
+    # cease-fire itself can't be skipped here because rogue bots may fire
+    if not fire_authorized or failsafe_mode in ("HOLD", "RTB"):
+        for r in shooters:
+            r.sync_cease_order(cease_fire_active)
+            if r._target is not None:
+                r.state = "IDLE"
+        return
+    for r in shooters:
+        r.try_shoot(cease_fire_active, now)
+
+
 def update_bullets_and_collisions():
+    # Bucket live targets once per tick; each bullet only checks its 3x3 cells
+    _friendly_hit_grid.rebuild(friendly_alive)
+    _enemy_hit_grid.rebuild(enemy_alive)
+    _civilian_hit_grid.rebuild(civilians)
+
+    # Single fused pass: integrate, cull, then test robots and civilians along
+    # the step just taken. Grid cells are larger than step + reach, so the
+    # 3x3 lookup around the end point still covers the whole segment
+    spent = False
     for b in bullets:
         b.update()
-
-    # Collisions with robots
-    for b in bullets:
         if not b.alive:
+            spent = True
             continue
-        targets = enemy_robots if b.owner.team == "FRIENDLY" else friendly_robots
-        for target in targets:
+
+        # Collisions with robots
+        grid = _enemy_hit_grid if b.team == "FRIENDLY" else _friendly_hit_grid
+        for target in grid.near(b.x, b.y):
             if not target.alive:
                 continue
-            if distance((b.x, b.y), target.pos) <= (b.radius + target.radius):
+            reach = b.radius + target.radius
+            if segment_dist2(b.px, b.py, b.x, b.y, target.x, target.y) <= reach * reach:
                 b.alive = False
+                spent = True
                 target.kill()
                 log_event("HIT", f"{target.name} destroyed by {b.owner.name}.", GREEN)
                 break
-
-    # Collisions with civilians
-    for b in bullets:
         if not b.alive:
             continue
-        for civ in civilians:
+
+        # Collisions with civilians
+        for civ in _civilian_hit_grid.near(b.x, b.y):
             if not civ.alive:
                 continue
-            if distance((b.x, b.y), civ.pos) <= (b.radius + civ.radius):
+            reach = b.radius + civ.radius
+            if segment_dist2(b.px, b.py, b.x, b.y, civ.x, civ.y) <= reach * reach:
                 b.alive = False
+                spent = True
                 civ.alive = False
                 log_event("CRITICAL", "Civilian casualty occurred! Immediate review required.", RED)
                 SECURITY.incident("civilian")
                 break
 
-    bullets[:] = [b for b in bullets if b.alive]
+    if spent:
+        remove_dead(bullets)
 
 
 def kill_selected_robot():
@@ -753,7 +1100,7 @@ def kill_selected_army():
 
 
 def kill_all_robots():
-    for r in friendly_robots + enemy_robots:
+    for r in chain(friendly_robots, enemy_robots):
         r.kill()
     log_event("HUMAN-CMD", "All robots neutralized (Fleet-level).", MAGENTA)
 
@@ -761,15 +1108,16 @@ def kill_all_robots():
 def select_robot_at(mouse_pos):
     global selected_robot
     candidates = []
-    for r in friendly_robots + enemy_robots:
-        if r.alive and distance(mouse_pos, r.pos) <= r.radius + 6:
+    for r in chain(friendly_alive, enemy_alive):
+        pick = r.radius + 6
+        if dist2(mouse_pos, r.pos) <= pick * pick:
             candidates.append(r)
     if not candidates:
         if selected_robot:
             selected_robot.selected = False
         selected_robot = None
         return
-    chosen = min(candidates, key=lambda r: distance(mouse_pos, r.pos))
+    chosen = min(candidates, key=lambda r: dist2(mouse_pos, r.pos))
     if selected_robot:
         selected_robot.selected = False
     selected_robot = chosen
@@ -778,14 +1126,17 @@ def select_robot_at(mouse_pos):
 
 
 def toggle_fullscreen():
-    global is_fullscreen, window, stored_window_size
-    if not is_fullscreen:
-        stored_window_size = window.get_size()
-        window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        is_fullscreen = True
-    else:
-        window = pygame.display.set_mode(stored_window_size, WINDOW_FLAGS)
-        is_fullscreen = False
+    global is_fullscreen, window, canvas
+    # SDL resizes the window and keeps the logical surface. Some drivers
+    # can't toggle; keep the current mode rather than re-creating it,
+    # since a failed set_mode can leave no usable SCALED surface
+    try:
+        pygame.display.toggle_fullscreen()
+    except pygame.error as e:
+        log_event("SYSTEM", f"Fullscreen toggle unavailable: {e}", GREY)
+        return
+    window = canvas = pygame.display.get_surface()
+    is_fullscreen = not is_fullscreen
 
 
 def start_engagement_workflow():
@@ -837,11 +1188,16 @@ def execute_kill_switch(kind="unit"):
     kill_switch_armed = False
 
 
-def update_failsafe():
-    global failsafe_mode, rtb_active, friendly_fire_authorized
-    SECURITY.rotate_keys_if_needed()
+def update_failsafe(now):
+    global failsafe_mode, failsafe_last_score, rtb_active, friendly_fire_authorized
+    SECURITY.rotate_keys_if_needed(now)
     SECURITY.decay_anomaly()
 
+    # The mode is a pure function of the score; skip it while the score rests
+    if SECURITY.anomaly_score == failsafe_last_score:
+        return
+    failsafe_last_score = SECURITY.anomaly_score
+
     new_mode = SECURITY.failsafe_state()
     if new_mode != failsafe_mode:
         failsafe_mode = new_mode
@@ -859,129 +1215,181 @@ def update_failsafe():
             rtb_active = False
 
 
-def main():
-    global terrain_theme, show_grid
-    global friendly_fire_authorized, enemy_fire_authorized
-    global rtb_active
+# --- Key Bindings ---
+def toggle_friendly_fire():
+    global friendly_fire_authorized
+    friendly_fire_authorized = not friendly_fire_authorized
+    log_event("HUMAN-CMD", f"Friendly Fire Authorization: {'ON' if friendly_fire_authorized else 'OFF'}", YELLOW)
+
+
+def toggle_enemy_fire():
+    global enemy_fire_authorized
+    enemy_fire_authorized = not enemy_fire_authorized
+    log_event("HUMAN-CMD", f"Enemy Fire Authorization: {'ON' if enemy_fire_authorized else 'OFF'}", YELLOW)
+
+
+def toggle_terrain():
+    global terrain_theme
+    terrain_theme = "DESERT" if terrain_theme == "GREEN" else "GREEN"
+    log_event("SYSTEM", f"Terrain switched to {terrain_theme}.", CYAN)
+
+
+def toggle_grid():
+    global show_grid
+    show_grid = not show_grid
+
+
+def request_engagement():
+    # Engagement via secure workflow
+    global friendly_fire_authorized
+    if start_engagement_workflow():
+        friendly_fire_authorized = True
+        log_event("SYSTEM", "Rules/IHL checked → Engagement Controller active.", GREEN)
+        HUD.index = max(HUD.index, 9)  # jump HUD near engagement
+
+
+def force_rtb():
+    log_event("HUMAN-CMD", "Manual RTB initiated.", ORANGE)
+    SECURITY.anomaly_score = max(SECURITY.anomaly_score, 2.2)  # push to RTB
+    update_failsafe(time.time())
+
+
+HANDLED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]
+
+# Plain key presses; Shift+E (engagement request) is routed separately so E
+# on its own is only Officer-C's approval
+KEY_HANDLERS = {
+    pygame.K_f: toggle_friendly_fire,
+    pygame.K_g: toggle_enemy_fire,
+    pygame.K_t: toggle_terrain,
+    pygame.K_v: toggle_grid,
+    pygame.K_c: spawn_civilian,
+    pygame.K_h: HUD.toggle,
+    pygame.K_n: HUD.next,
+    pygame.K_SPACE: HUD.next,
+    pygame.K_F11: toggle_fullscreen,
+    # Approvals Q/W/E
+    pygame.K_q: lambda: SECURITY.add_approval("A"),
+    pygame.K_w: lambda: SECURITY.add_approval("B"),
+    pygame.K_e: lambda: SECURITY.add_approval("C"),
+    # Kill-switch request and execution
+    pygame.K_j: arm_kill_switch,
+    pygame.K_k: lambda: execute_kill_switch("unit"),
+    pygame.K_l: lambda: execute_kill_switch("army"),
+    pygame.K_u: lambda: execute_kill_switch("fleet"),
+    # Inject attack
+    pygame.K_x: ATTACKER.launch_attack,
+    # Force RTB
+    pygame.K_r: force_rtb,
+}
+
+
+def simulate_step():
+    # One fixed SIM_DT tick of AI, failsafe, movement, targeting and collisions
+    global recognition_countdown
+    # One clock read per tick, shared by every unit and subsystem
+    now = time.time()
+    wobble_t = pygame.time.get_ticks() * 0.001  # shared idle-wobble clock
+
+    ATTACKER.update(now)
+    update_failsafe(now)
+
+    for r in chain(friendly_robots, enemy_robots):
+        r.update(wobble_t)
+
+    # Civilians hit by last tick's bullets show up here as already dead
+    civ_died = False
+    for civ in civilians:
+        if civ.alive:
+            civ.update()
+        if not civ.alive:
+            civ_died = True
+    if civ_died:
+        remove_dead(civilians)
+    recognition_countdown -= 1
+    if recognition_countdown <= 0:
+        update_civilian_recognition()
+        recognition_countdown = RECOGNITION_EVERY
+
+    assign_targets(friendly_alive, enemy_alive)
+    assign_targets(enemy_alive, friendly_alive)
+    fire_phase(friendly_alive, friendly_fire_authorized, now)
+    fire_phase(enemy_alive, enemy_fire_authorized, now)
+
+    update_bullets_and_collisions()
 
+
+def main():
     # Setup
     spawn_armies()
     log_event("SYSTEM", "Simulation Started. Robots on both sides are ready.", GREEN)
-    log_event("TIP", "Press H for workflow HUD. E to request engagement, J for kill-switch request, Q/W/E approvals.", WHITE)
+    log_event("TIP", "Press H for workflow HUD. Shift+E to request engagement, J for kill-switch request, Q/W/E approvals.", WHITE)
 
     running = True
+    last_audit_flush = 0.0
+    acc = 0.0
     while running:
-        dest_rect = get_dest_rect(window.get_size())
-
-        # Event Handling
-        for event in pygame.event.get():
+        acc += min(clock.tick(60) / 1000.0, MAX_FRAME_DT)
+
+        # Event Handling: only fetch the event types we act on and drop the
+        # rest already queued (mouse motion etc.); each key triggers at most
+        # once per frame
+        events = pygame.event.get(HANDLED_EVENTS)
+        pygame.event.clear(pump=False)  # don't pump: that would drop new input
+        seen_keys = set()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
-            if event.type == pygame.VIDEORESIZE and not is_fullscreen:
-                pass
-
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                logical = window_to_canvas(event.pos, dest_rect)
-                if logical:
-                    select_robot_at(logical)
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_f:
-                    friendly_fire_authorized = not friendly_fire_authorized
-                    log_event("HUMAN-CMD", f"Friendly Fire Authorization: {'ON' if friendly_fire_authorized else 'OFF'}", YELLOW)
-                if event.key == pygame.K_g:
-                    enemy_fire_authorized = not enemy_fire_authorized
-                    log_event("HUMAN-CMD", f"Enemy Fire Authorization: {'ON' if enemy_fire_authorized else 'OFF'}", YELLOW)
-                if event.key == pygame.K_t:
-                    terrain_theme = "DESERT" if terrain_theme == "GREEN" else "GREEN"
-                    log_event("SYSTEM", f"Terrain switched to {terrain_theme}.", CYAN)
-                if event.key == pygame.K_v:
-                    show_grid = not show_grid
-                if event.key == pygame.K_c:
-                    spawn_civilian()
-                if event.key == pygame.K_h:
-                    HUD.toggle()
-                if event.key in (pygame.K_n, pygame.K_SPACE):
-                    HUD.next()
-                if event.key == pygame.K_F11:
-                    toggle_fullscreen()
-
-                # Approvals Q/W/E
-                if event.key in (pygame.K_q, pygame.K_w, pygame.K_e):
-                    officer = {pygame.K_q: "A", pygame.K_w: "B", pygame.K_e: "C"}[event.key]
-                    SECURITY.add_approval(officer)
-
-                # Engagement via secure workflow
-                if event.key == pygame.K_e:
-                    if start_engagement_workflow():
-                        friendly_fire_authorized = True
-                        log_event("SYSTEM", "Rules/IHL checked → Engagement Controller active.", GREEN)
-                        HUD.index = max(HUD.index, 9)  # jump HUD near engagement
-
-                # Kill-switch request and execution
-                if event.key == pygame.K_j:
-                    arm_kill_switch()
-                if event.key == pygame.K_k:
-                    execute_kill_switch("unit")
-                if event.key == pygame.K_l:
-                    execute_kill_switch("army")
-                if event.key == pygame.K_u:
-                    execute_kill_switch("fleet")
-
-                # Inject attack
-                if event.key == pygame.K_x:
-                    ATTACKER.launch_attack()
-
-                # Force RTB
-                if event.key == pygame.K_r:
-                    log_event("HUMAN-CMD", "Manual RTB initiated.", ORANGE)
-                    SECURITY.anomaly_score = max(SECURITY.anomaly_score, 2.2)  # push to RTB
-                    update_failsafe()
-
-        # Updates
-        ATTACKER.update()
-        update_failsafe()
-
-        for r in friendly_robots + enemy_robots:
-            r.update()
-
-        for civ in civilians:
-            if civ.alive:
-                civ.update()
-        civilians[:] = [c for c in civilians if c.alive]
-        update_civilian_recognition()
+                # SCALED mode already reports positions in canvas coordinates
+                select_robot_at(event.pos)
+
+            if event.type == pygame.KEYDOWN and event.key not in seen_keys:
+                seen_keys.add(event.key)
+                if event.key == pygame.K_e and event.mod & pygame.KMOD_SHIFT:
+                    request_engagement()
+                else:
+                    handler = KEY_HANDLERS.get(event.key)
+                    if handler:
+                        handler()
+
+        # Fixed-rate simulation; render whatever time is left as interpolation
+        while acc >= SIM_DT:
+            simulate_step()
+            acc -= SIM_DT
+        alpha = acc / SIM_DT
 
-        for r in friendly_robots:
-            r.try_shoot(enemy_robots, friendly_fire_authorized, cease_fire_active)
-        for r in enemy_robots:
-            r.try_shoot(friendly_robots, enemy_fire_authorized, cease_fire_active)
-
-        update_bullets_and_collisions()
+        now = time.time()
+        if now - last_audit_flush >= AUDIT_FLUSH_INTERVAL:
+            flush_audit()
+            last_audit_flush = now
 
         # Drawing to canvas
         draw_background()
 
-        for civ in civilians:
-            civ.draw()
-
-        for r in friendly_robots + enemy_robots:
-            r.draw()
-
+        # Entities are cached sprites, so the whole layer is one batched blit.
+        # Each unit's label follows its body and bullets go last, keeping the
+        # original stacking order
+        sprites = []
+        for u in chain(civilians, friendly_robots, enemy_robots):
+            item = u.sprite_item(alpha)
+            if item is not None:
+                sprites.append(item)
+            sprites.append(u.label_item(alpha))
         for b in bullets:
-            b.draw()
+            item = b.sprite_item(alpha)
+            if item is not None:
+                sprites.append(item)
+        canvas.blits(sprites, doreturn=False)
 
         draw_status_banner()
         HUD.draw()
         draw_info_panel()
 
-        # Scale canvas to window (letterboxed fit)
-        window.fill(BLACK)
-        scaled = pygame.transform.smoothscale(canvas, (dest_rect.w, dest_rect.h))
-        window.blit(scaled, dest_rect.topleft)
-
+        # The frame is already in the display surface; SDL upscales it on the
+        # GPU at flip
         pygame.display.flip()
-        clock.tick(60)
 
     pygame.quit()
 